@@ -2,6 +2,12 @@ import pygame
 import sys
 import math
 import random
+import logging
+import numpy as np
+
+# --- Logging (Debug chatter off by default; %-style args are only formatted when enabled) ---
+logger = logging.getLogger('neurotic')
+logger.setLevel(logging.WARNING)
 
 # --- Colors ---
 WHITE = (255, 255, 255)
@@ -12,22 +18,66 @@ GREY = (150, 150, 150)
 GREEN = (0, 200, 0)
 YELLOW = (200, 200, 0) # For temporary connection line
 
+# --- Sprite Cache (Pre-rendered object visuals, keyed by class + visual state) ---
+_SPRITE_CACHE = {}
+
+# --- Input Node Grid (Spatial hash for finding the input under the cursor on a drop) ---
+INPUT_GRID_CELL = 20 # Cell size in pixels, about one node plus click tolerance
+input_node_grid = {} # (cell_x, cell_y) -> objects with an input node rect overlapping that cell
+
+# Batched blit of (sprite, topleft) pairs: pygame-ce's fblits when available
+if hasattr(pygame.Surface, 'fblits'):
+    def blit_sprites(surface, blit_list):
+        surface.fblits(blit_list)
+else:
+    def blit_sprites(surface, blit_list):
+        surface.blits(blit_list, doreturn=False)
+
 # --- Base Draggable Object Class (Corrected) ---
 class DraggableObject:
+    __slots__ = ('rect', 'color', 'is_dragging', 'drag_offset_x', 'drag_offset_y', 'id',
+                 'sprite_margin', 'sprite_size', '_last_blit', '_last_rect', '_hit_bbox')
+    _next_id = 0 # Small monotonically assigned ids (dense, usable as array indices)
+
     def __init__(self, x, y, width, height, color):
         self.rect = pygame.Rect(x, y, width, height)
         self.color = color
         self.is_dragging = False
         self.drag_offset_x = 0
         self.drag_offset_y = 0
-        self.id = id(self)
+        self.id = DraggableObject._next_id
+        DraggableObject._next_id += 1
+        # Sprite covers the rect plus any nodes sticking out of it
+        self.sprite_margin = (0, 0) # Offset of rect.topleft inside the sprite
+        self.sprite_size = (width, height)
+        # Last (sprite, topleft) drawn and its screen area, for dirty-rect redraws
+        self._last_blit = None
+        self._last_rect = None
+        # Coarse hit box (sprite area incl. nodes) tested before any fine-grained hit test
+        self._hit_bbox = pygame.Rect(0, 0, 0, 0)
+        self._update_hit_bbox()
+
+    def _update_hit_bbox(self):
+        """ Recomputes the coarse hit box; call whenever the rect moves. """
+        pad = 2
+        self._hit_bbox.update(self.rect.x - self.sprite_margin[0] - pad, self.rect.y - self.sprite_margin[1] - pad,
+                              self.sprite_size[0] + pad * 2, self.sprite_size[1] + pad * 2)
+
+    def _event_outside(self, event):
+        """ True for a button release away from this object (and not ending its drag).
+        Presses are already filtered by _hit_bbox in the main loop's dispatch. """
+        return (event.type == pygame.MOUSEBUTTONUP and not self.is_dragging
+                and not self._hit_bbox.collidepoint(event.pos))
+
+    def _update_node_positions(self):
+        """ Recomputes rect-relative geometry after a move; subclasses add their nodes. """
+        self._update_hit_bbox()
 
-    def handle_event(self, event, global_state=None, connections=None):
+    def handle_event(self, event, global_state=None):
         # Basic dragging logic - derived classes will override/extend
         # ... (rest of existing handle_event logic unchanged) ...
-        # Make sure recursive calls also pass connections if needed
         handled = False # Example if calling parent's method
-        # handled = super().handle_event(event, global_state, connections) # If inheriting handle_event logic
+        # handled = super().handle_event(event, global_state) # If inheriting handle_event logic
         # ...
         if event.type == pygame.MOUSEBUTTONDOWN:
             if self.rect.collidepoint(event.pos):
@@ -47,25 +97,80 @@ class DraggableObject:
             if self.is_dragging:
                 self.rect.x = event.pos[0] + self.drag_offset_x
                 self.rect.y = event.pos[1] + self.drag_offset_y
-                if hasattr(self, '_update_node_positions') and callable(getattr(self, '_update_node_positions')):
-                     self._update_node_positions()
+                self._update_node_positions()
                 return True
         return False
 
+    def _sprite_key(self):
+        return (type(self), self.rect.size, self.color)
+
+    def _render_sprite(self):
+        _rect = pygame.draw.rect # Local alias (skip attribute chains)
+        sprite = pygame.Surface(self.sprite_size, pygame.SRCALPHA).convert_alpha()
+        body_rect = pygame.Rect(self.sprite_margin, self.rect.size)
+        _rect(sprite, self.color, body_rect)
+        _rect(sprite, BLACK, body_rect, 1)
+        return sprite
+
+    def get_sprite(self):
+        """ Returns (sprite, topleft) for the current visual state, rendering it once per state. """
+        key = self._sprite_key()
+        sprite = _SPRITE_CACHE.get(key)
+        if sprite is None:
+            sprite = _SPRITE_CACHE[key] = self._render_sprite()
+        return sprite, (self.rect.x - self.sprite_margin[0], self.rect.y - self.sprite_margin[1])
+
     def draw(self, surface):
-        pygame.draw.rect(surface, self.color, self.rect)
-        pygame.draw.rect(surface, BLACK, self.rect, 1)
+        surface.blit(*self.get_sprite())
 
     # Removed the conflicting placeholder properties/methods for nodes
     # Derived classes like Perceptron will define their own specific node handling
 
 
-# --- Default Activation Function (Unchanged) ---
-def step_function(x):
-    return 1 if x >= 0 else 0
+# --- Connectable Node Base (Class-level defaults instead of getattr/hasattr probes) ---
+class Node(DraggableObject):
+    """ Base for objects that can be wired; subclasses override the node attributes they have. """
+    __slots__ = ('_grid_cells',)
+    output_node_pos = None # No output node
+    input_nodes_pos = () # No input nodes
+    input_connections = ()
+    _input_node_rects = ()
+
+    def __init__(self, x, y, width, height, color):
+        super().__init__(x, y, width, height, color)
+        self._grid_cells = set() # input_node_grid cells this object is filed under
+
+    def _file_input_nodes(self):
+        """ Re-files this object in input_node_grid under every cell its input node
+        rects overlap; call whenever the input nodes move. """
+        cells = set()
+        for rect in self._input_node_rects:
+            for cell_x in range(rect.left // INPUT_GRID_CELL, (rect.right - 1) // INPUT_GRID_CELL + 1):
+                for cell_y in range(rect.top // INPUT_GRID_CELL, (rect.bottom - 1) // INPUT_GRID_CELL + 1):
+                    cells.add((cell_x, cell_y))
+        if cells == self._grid_cells:
+            return # Most drag steps stay within the same cells
+        for cell in self._grid_cells:
+            occupants = input_node_grid[cell]
+            occupants.remove(self)
+            if not occupants:
+                del input_node_grid[cell] # Don't keep every cell a drag ever passed through
+        for cell in cells:
+            input_node_grid.setdefault(cell, []).append(self)
+        self._grid_cells = cells
+
 
 # --- Perceptron Class (Corrected - uses direct attributes now) ---
-class Perceptron(DraggableObject):
+class Perceptron(Node):
+    __slots__ = ('num_inputs', 'pool', '_row', 'input_connections', 'input_node_radius', 'output_node_radius',
+                 'button_size', 'plus_button_rect', 'minus_button_rect', 'max_inputs', 'min_inputs',
+                 'input_nodes_pos', 'output_node_pos', '_input_node_rects', '_output_node_rect',
+                 '_plus_glyph_topleft', '_minus_glyph_topleft')
+    # Bound once after pygame.font.init() (see Initialization)
+    _font = None
+    _plus_surf = None
+    _minus_surf = None
+
     def __init__(self, x, y, num_inputs=2, weights=None, bias=None):
         # --- Existing init code ---
         width, height = 60, 80 # Initial size - might need adjustment later if many inputs
@@ -74,66 +179,98 @@ class Perceptron(DraggableObject):
         # Force min 1 input
         self.num_inputs = max(1, num_inputs)
 
-        # --- Weights/Bias/Activation (Existing) ---
+        # --- Weights/Bias/Activation (Stored as a row of the shared pool) ---
         if weights is None:
             # Ensure weight list matches initial num_inputs
-            self.weights = [random.uniform(-1, 1) for _ in range(self.num_inputs)]
-        else:
-            if len(weights) == self.num_inputs: self.weights = weights
-            else: raise ValueError(f"Initial weights length ({len(weights)}) != num_inputs ({self.num_inputs})")
-        self.bias = random.uniform(-1, 1) if bias is None else bias
-        self.activation_function = step_function
-        self.output_value = 0
-        self.input_values = [0] * self.num_inputs
+            weights = np.random.uniform(-1, 1, self.num_inputs).astype(np.float32)
+        elif len(weights) != self.num_inputs:
+            raise ValueError(f"Initial weights length ({len(weights)}) != num_inputs ({self.num_inputs})")
+        bias = random.uniform(-1, 1) if bias is None else bias
+        self.pool = perceptron_pool
+        self._row = self.pool.add(self, weights, bias)
         # Ensure connections list matches initial num_inputs
         self.input_connections = [None] * self.num_inputs
 
         # --- Node Radii (Existing) ---
         self.input_node_radius = 5
         self.output_node_radius = 6
+        self.sprite_margin = (self.input_node_radius * 2, 0)
+        self.sprite_size = (width + self.input_node_radius * 2 + self.output_node_radius * 2, height)
 
         # --- Button Properties ---
         self.button_size = 15 # Size of the square +/- buttons
         self.plus_button_rect = pygame.Rect(0, 0, self.button_size, self.button_size)
         self.minus_button_rect = pygame.Rect(0, 0, self.button_size, self.button_size)
-        self.max_inputs = 8 # Set a max limit for sanity
+        self.max_inputs = self.pool.max_inputs # Set a max limit for sanity (pool row width)
         self.min_inputs = 1 # Minimum 1 input
 
         # --- Initial node/button position calculation ---
-        self.input_nodes_pos = []
-        self.output_node_pos = (0, 0)
-        self._input_node_rects = []
-        self._output_node_rect = pygame.Rect(0,0,0,0)
+        # Allocated once; _update_node_positions mutates them in place
+        self.input_nodes_pos = [[0, 0] for _ in range(self.num_inputs)]
+        self.output_node_pos = [0, 0]
+        self._input_node_rects = [self._new_input_node_rect() for _ in range(self.num_inputs)]
+        self._output_node_rect = pygame.Rect(0, 0, self.output_node_radius * 2, self.output_node_radius * 2)
         self._update_node_positions() # Calculate initial positions for nodes AND buttons
 
+    def _new_input_node_rect(self):
+        return pygame.Rect(0, 0, self.input_node_radius * 2, self.input_node_radius * 2)
+
     def _update_node_positions(self):
         """ Calculates the absolute screen positions of connection nodes AND UI buttons. """
-        # --- Node Position Update (Existing) ---
-        self.input_nodes_pos = []
+        # --- Node Position Update (In place, no per-move allocation) ---
         # Adjust height slightly if many inputs? For now, fixed height.
         # Consider dynamic height: self.rect.height = max(80, self.num_inputs * 15 + 10)
         input_spacing = self.rect.height / (self.num_inputs + 1)
-        for i in range(self.num_inputs):
-            node_x = self.rect.left - self.input_node_radius
-            node_y = self.rect.top + int(input_spacing * (i + 1))
-            self.input_nodes_pos.append((node_x, node_y))
-        self.output_node_pos = (self.rect.right + self.output_node_radius, self.rect.centery)
-        self._input_node_rects = [ pygame.Rect(
-                pos[0] - self.input_node_radius, pos[1] - self.input_node_radius,
-                self.input_node_radius * 2, self.input_node_radius * 2
-            ) for pos in self.input_nodes_pos ]
-        self._output_node_rect = pygame.Rect(
-            self.output_node_pos[0] - self.output_node_radius,
-            self.output_node_pos[1] - self.output_node_radius,
-            self.output_node_radius * 2, self.output_node_radius * 2
-        )
+        node_x = self.rect.left - self.input_node_radius
+        for i, (pos, rect) in enumerate(zip(self.input_nodes_pos, self._input_node_rects)):
+            pos[0] = node_x
+            pos[1] = self.rect.top + int(input_spacing * (i + 1))
+            rect.x = pos[0] - self.input_node_radius
+            rect.y = pos[1] - self.input_node_radius
+        self.output_node_pos[0] = self.rect.right + self.output_node_radius
+        self.output_node_pos[1] = self.rect.centery
+        self._output_node_rect.x = self.output_node_pos[0] - self.output_node_radius
+        self._output_node_rect.y = self.output_node_pos[1] - self.output_node_radius
 
         # --- Button Position Update ---
         # Place them near the top-right corner for now
         button_margin = 3
         self.plus_button_rect.topright = (self.rect.right - button_margin, self.rect.top + button_margin)
         self.minus_button_rect.topright = (self.plus_button_rect.left - button_margin, self.rect.top + button_margin)
+        # Glyph positions centered on the buttons (only change when the rect moves)
+        plus_w, plus_h = self._plus_surf.get_size()
+        minus_w, minus_h = self._minus_surf.get_size()
+        self._plus_glyph_topleft = (self.plus_button_rect.centerx - plus_w // 2, self.plus_button_rect.centery - plus_h // 2)
+        self._minus_glyph_topleft = (self.minus_button_rect.centerx - minus_w // 2, self.minus_button_rect.centery - minus_h // 2)
+        self._file_input_nodes()
+        self._update_hit_bbox()
+
+
+    # --- Views into this perceptron's pool row ---
+    @property
+    def weights(self):
+        """ Copy of this perceptron's weights (assign to change them). """
+        return self.pool.get_weights(self._row)[:self.num_inputs]
+
+    @weights.setter
+    def weights(self, values):
+        self.pool.set_weights(self._row, values)
+
+    @property
+    def bias(self):
+        return self.pool.b[self._row]
 
+    @bias.setter
+    def bias(self, value):
+        self.pool.set_bias(self._row, value)
+
+    @property
+    def output_value(self):
+        return self.pool.out[self._row]
+
+    @property
+    def input_values(self):
+        return self.pool.x[self._row, :self.num_inputs]
 
     # --- Add the getter properties if they were removed ---
     @property
@@ -145,51 +282,49 @@ class Perceptron(DraggableObject):
             return self._input_node_rects[index]
         return None
 
-    # handle_event, calculate_output, draw methods remain the same as before
-    # Make sure they internally reference self.output_node_pos, self.input_nodes_pos, etc. directly
-    # (They already did, so they should be fine)
-    def handle_event(self, event, global_state, connections=None):
+    def handle_event(self, event, global_state):
+        if self._event_outside(event):
+            return False # Skip every fine-grained hit test below
         # --- Check Button Clicks FIRST ---
         if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1: # Left-click only
             # Check '+' Button
             if self.plus_button_rect.collidepoint(event.pos):
                 if self.num_inputs < self.max_inputs:
-                    print(f"Perceptron {self.id}: Increasing inputs to {self.num_inputs + 1}")
+                    logger.debug("Perceptron %s: Increasing inputs to %s", self.id, self.num_inputs + 1)
+                    self.pool.set_weight(self._row, self.num_inputs, random.uniform(-1, 1)) # Add new random weight
                     self.num_inputs += 1
-                    self.weights.append(random.uniform(-1, 1)) # Add new random weight
                     self.input_connections.append(None)
-                    self.input_values.append(0) # Match input_values list size
+                    self.input_nodes_pos.append([0, 0])
+                    self._input_node_rects.append(self._new_input_node_rect())
+                    self.pool.mark_wiring_changed()
                     self._update_node_positions()
                     return True # Handled
                 else:
-                    print(f"Perceptron {self.id}: Max inputs ({self.max_inputs}) reached.")
+                    logger.debug("Perceptron %s: Max inputs (%s) reached.", self.id, self.max_inputs)
                     return True # Handled (consumed click)
 
             # Check '-' Button
             elif self.minus_button_rect.collidepoint(event.pos):
                 if self.num_inputs > self.min_inputs:
-                    print(f"Perceptron {self.id}: Decreasing inputs to {self.num_inputs - 1}")
+                    logger.debug("Perceptron %s: Decreasing inputs to %s", self.id, self.num_inputs - 1)
                     self.num_inputs -= 1
-                    # Remove last weight and connection slot
-                    self.weights.pop()
+                    # Remove last weight (zero its padded pool column) and connection slot
+                    self.pool.set_weight(self._row, self.num_inputs, 0.0)
                     removed_connection_source = self.input_connections.pop()
-                    self.input_values.pop() # Match input_values list size
+                    self.input_nodes_pos.pop()
+                    self._input_node_rects.pop()
+                    self.pool.mark_wiring_changed()
 
-                    # *** IMPORTANT: Remove any connection from global list ***
-                    if removed_connection_source is not None and connections is not None:
+                    # *** IMPORTANT: Remove any connection from global connections ***
+                    if removed_connection_source is not None:
                         target_input_index_removed = self.num_inputs # Index that was removed
-                        for idx in range(len(connections) - 1, -1, -1):
-                             conn = connections[idx]
-                             # Check if this connection was the one going to the removed input slot
-                             if conn['target_obj'] == self and conn['target_input_idx'] == target_input_index_removed:
-                                  connections.pop(idx)
-                                  print(f"  Removed connection from global list for input {target_input_index_removed}")
-                                  break # Found and removed
+                        if remove_connection((self.id, target_input_index_removed)) is not None:
+                            logger.debug("  Removed connection from global connections for input %s", target_input_index_removed)
 
                     self._update_node_positions()
                     return True # Handled
                 else:
-                    print(f"Perceptron {self.id}: Min inputs ({self.min_inputs}) reached.")
+                    logger.debug("Perceptron %s: Min inputs (%s) reached.", self.id, self.min_inputs)
                     return True # Handled (consumed click)
 
         # --- If no button was clicked, proceed with existing node/drag/right-click logic ---
@@ -197,35 +332,30 @@ class Perceptron(DraggableObject):
         if event.type == pygame.MOUSEBUTTONDOWN:
             # --- Right-click for deleting (Existing) ---
             if event.button == 3:
-                for i, rect in enumerate(self._input_node_rects):
-                    if rect.collidepoint(event.pos):
-                        # ... (existing right-click removal logic) ...
-                        if self.input_connections[i] is not None:
-                            self.input_connections[i] = None
-                            if connections is not None:
-                                 for idx in range(len(connections) - 1, -1, -1):
-                                     conn = connections[idx]
-                                     if conn['target_obj'] == self and conn['target_input_idx'] == i:
-                                         connections.pop(idx)
-                                         break
-                            return True
-                        else: return True # Handled click
+                i = pygame.Rect(event.pos, (1, 1)).collidelist(self._input_node_rects) # Scan in C
+                if i != -1:
+                    # ... (existing right-click removal logic) ...
+                    if self.input_connections[i] is not None:
+                        self.input_connections[i] = None
+                        self.pool.mark_wiring_changed()
+                        remove_connection((self.id, i))
+                        return True
+                    else: return True # Handled click
                 # Pass - allow other handling if not on node
 
             # --- Left-click (Nodes or Drag) ---
             elif event.button == 1:
                 # Check output node (Existing)
-                if hasattr(self, '_output_node_rect') and self._output_node_rect.collidepoint(event.pos):
+                if self._output_node_rect.collidepoint(event.pos):
                     # ... (start connection logic) ...
-                    global_state['is_drawing_connection'] = True
-                    global_state['connection_start_obj'] = self
-                    global_state['connection_start_pos'] = self.output_node_pos
+                    global_state.is_drawing_connection = True
+                    global_state.connection_start_obj = self
+                    global_state.connection_start_pos = tuple(self.output_node_pos) # Snapshot, the list moves with drags
                     return True
                 # Check input nodes (Existing)
-                if not global_state.get('is_drawing_connection'):
-                    for i, rect in enumerate(self._input_node_rects):
-                        if rect.collidepoint(event.pos):
-                            return True # Consume click
+                if not global_state.is_drawing_connection:
+                    if pygame.Rect(event.pos, (1, 1)).collidelist(self._input_node_rects) != -1:
+                        return True # Consume click
                 # Check body drag (Existing) - This is now only reached if no button/node was hit
                 if self.rect.collidepoint(event.pos):
                     self.is_dragging = True
@@ -248,74 +378,276 @@ class Perceptron(DraggableObject):
         return drag_handled
 
 
-    def calculate_output(self):
-        current_inputs = []
-        for i in range(self.num_inputs):
-             # Check index bounds for safety
-             if i < len(self.input_connections):
-                  source_obj = self.input_connections[i]
-                  if source_obj:
-                      current_inputs.append(getattr(source_obj, 'output_value', 0))
-                  else:
-                      current_inputs.append(0)
-             else:
-                  current_inputs.append(0) # Append 0 if index out of bounds
-
-        self.input_values = current_inputs
-        # Ensure weights list matches input values length before zip
-        if len(self.weights) != len(self.input_values):
-             print(f"Warning: Weight count ({len(self.weights)}) != Input count ({len(self.input_values)}) in Perceptron {self.id}. Recalculating.")
-             # Adjust weights list - might need better strategy
-             # For now, pad with 0 or truncate
-             self.weights = self.weights[:len(self.input_values)] + [0.0] * (len(self.input_values) - len(self.weights))
-
+    def _sprite_key(self):
+        return (Perceptron, self.num_inputs, int(self.output_value), self.input_values.tobytes())
 
-        weighted_sum = sum(w * i for w, i in zip(self.weights, self.input_values)) + self.bias
-        self.output_value = self.activation_function(weighted_sum)
-
-
-    def draw(self, surface):
-        # --- Draw Body and Nodes (Existing) ---
+    def _render_sprite(self):
+        """ Draws body, nodes and +/- buttons into a sprite (sprite-local coordinates). """
+        _rect = pygame.draw.rect; _circle = pygame.draw.circle # Local aliases (skip attribute chains)
+        sprite = pygame.Surface(self.sprite_size, pygame.SRCALPHA).convert_alpha()
+        ox, oy = self.rect.x - self.sprite_margin[0], self.rect.y - self.sprite_margin[1]
+        # --- Draw Body and Nodes ---
         body_color = GREEN if self.output_value == 1 else GREY
-        pygame.draw.rect(surface, body_color, self.rect)
-        pygame.draw.rect(surface, BLACK, self.rect, 1)
+        body_rect = self.rect.move(-ox, -oy)
+        _rect(sprite, body_color, body_rect)
+        _rect(sprite, BLACK, body_rect, 1)
         # Input nodes
-        for i, pos in enumerate(self.input_nodes_pos):
-            pygame.draw.circle(surface, BLACK, pos, self.input_node_radius)
-            if i < len(self.input_values):
-                 in_val = self.input_values[i]
-                 inner_color = GREEN if in_val == 1 else WHITE
-                 pygame.draw.circle(surface, inner_color, pos, self.input_node_radius - 2)
-            else: pygame.draw.circle(surface, WHITE, pos, self.input_node_radius - 2)
+        input_values = self.input_values
+        for i, (x, y) in enumerate(self.input_nodes_pos):
+            pos = (x - ox, y - oy)
+            _circle(sprite, BLACK, pos, self.input_node_radius)
+            inner_color = GREEN if input_values[i] == 1 else WHITE
+            _circle(sprite, inner_color, pos, self.input_node_radius - 2)
         # Output node
-        pygame.draw.circle(surface, BLACK, self.output_node_pos, self.output_node_radius)
+        pos = (self.output_node_pos[0] - ox, self.output_node_pos[1] - oy)
+        _circle(sprite, BLACK, pos, self.output_node_radius)
         inner_color = GREEN if self.output_value == 1 else WHITE
-        pygame.draw.circle(surface, inner_color, self.output_node_pos, self.output_node_radius - 2)
+        _circle(sprite, inner_color, pos, self.output_node_radius - 2)
 
         # --- Draw +/- Buttons ---
+        plus_rect = self.plus_button_rect.move(-ox, -oy)
+        minus_rect = self.minus_button_rect.move(-ox, -oy)
         button_color = (100, 100, 200) # A blue-ish color for buttons
-        pygame.draw.rect(surface, button_color, self.plus_button_rect, border_radius=2)
-        pygame.draw.rect(surface, button_color, self.minus_button_rect, border_radius=2)
+        _rect(sprite, button_color, plus_rect, border_radius=2)
+        _rect(sprite, button_color, minus_rect, border_radius=2)
         # Draw borders
-        pygame.draw.rect(surface, WHITE, self.plus_button_rect, 1, border_radius=2)
-        pygame.draw.rect(surface, WHITE, self.minus_button_rect, 1, border_radius=2)
-
-        # Draw '+' and '-' symbols (requires pygame.font initialized)
-        if 'font' in globals(): # Basic check if font exists
-             plus_surf = font.render('+', True, WHITE)
-             minus_surf = font.render('-', True, WHITE)
-             plus_rect = plus_surf.get_rect(center=self.plus_button_rect.center)
-             minus_rect = minus_surf.get_rect(center=self.minus_button_rect.center)
-             surface.blit(plus_surf, plus_rect)
-             surface.blit(minus_surf, minus_rect)
-
-class Switch(DraggableObject):
+        _rect(sprite, WHITE, plus_rect, 1, border_radius=2)
+        _rect(sprite, WHITE, minus_rect, 1, border_radius=2)
+
+        # Draw '+' and '-' symbols (pre-rendered glyphs)
+        sprite.blit(self._plus_surf, (self._plus_glyph_topleft[0] - ox, self._plus_glyph_topleft[1] - oy))
+        sprite.blit(self._minus_surf, (self._minus_glyph_topleft[0] - ox, self._minus_glyph_topleft[1] - oy))
+        return sprite
+
+# --- Perceptron Pool (Batched evaluation of all perceptrons) ---
+class PerceptronPool:
+    """ Packs every Perceptron into one zero-padded weight matrix (N x max_inputs)
+    and bias vector b, so a frame's outputs come from one batched W.x + b per layer.
+    Signals are binary and the activation is a hard threshold, so the float32 master
+    weights W are evaluated through an int8 copy (W_q) with a per-row float scale:
+    W ~= W_q * scale[:, None]. The bias lives in the integer domain too, as a per-row
+    threshold on W_q.x fitted so every 0/1 input pattern is decided exactly as
+    W.x + b >= 0 would be; the rare row whose rounding makes that impossible is
+    decided from a truth table. Edits always requantize from W, never from W_q. """
+    def __init__(self, max_inputs=8):
+        self.max_inputs = max_inputs
+        self.members = [] # Perceptron owning each row
+        self.W = np.zeros((0, max_inputs), dtype=np.float32) # Master weights, as set
+        self.W_q = np.zeros((0, max_inputs), dtype=np.int8)
+        self.scale = np.zeros(0, dtype=np.float32)
+        self.b = np.zeros(0, dtype=np.float32)
+        self.threshold = np.zeros(0, dtype=np.int32) # Row fires when W_q.x >= threshold
+        self._truth_tables = {} # row -> output per input pattern, for rows no threshold fits
+        self._pattern_bits = 1 << np.arange(max_inputs) # Input slot i is bit i of a pattern index
+        self.out = np.zeros(0, dtype=np.int8)
+        self.x = np.zeros((0, max_inputs), dtype=np.int8) # Last gathered inputs
+        # Signal bus: [0 (unconnected), external sources..., perceptron outputs...]
+        self.src_idx = np.zeros((0, max_inputs), dtype=np.int32)
+        self.external_sources = []
+        self.sig = np.zeros(1, dtype=np.int8)
+        self.layers = [] # Row index arrays in topological order
+        self._layer_edges = None # (source row, row) pairs the layers were sorted from
+        self.feeds = np.zeros((1, 0), dtype=bool) # feeds[bus slot, row]: slot is one of row's inputs
+        self._dirty = np.zeros(0, dtype=bool) # Rows whose inputs/parameters changed since last evaluate
+        self.changed_rows = [] # Rows whose output flipped during the last evaluate
+        self._wiring_stale = True
+
+    def add(self, perceptron, weights, bias):
+        """ Appends a row for a new perceptron and returns its row index. """
+        row = len(self.members)
+        self.members.append(perceptron)
+        self._layer_edges = None # New row must be placed in a layer
+        self.W = np.vstack([self.W, np.zeros((1, self.max_inputs), dtype=np.float32)])
+        self.W_q = np.vstack([self.W_q, np.zeros((1, self.max_inputs), dtype=np.int8)])
+        self.scale = np.append(self.scale, np.float32(1.0))
+        self._dirty = np.append(self._dirty, True)
+        self.b = np.append(self.b, np.float32(bias))
+        self.threshold = np.append(self.threshold, np.int32(0))
+        self.set_weights(row, weights)
+        self.out = np.append(self.out, np.int8(0))
+        self.x = np.vstack([self.x, np.zeros((1, self.max_inputs), dtype=np.int8)])
+        self._wiring_stale = True
+        return row
+
+    def get_weights(self, row):
+        """ Copy of a row's float32 master weights, padding included. """
+        return self.W[row].copy()
+
+    def set_weights(self, row, weights):
+        """ Stores weights into the row (remaining slots are zeroed) and requantizes it. """
+        weights = np.asarray(weights, dtype=np.float32)
+        self.W[row] = 0
+        self.W[row, :weights.size] = weights
+        self._quantize_row(row)
+
+    def set_weight(self, row, index, value):
+        """ Changes one weight, requantizing the row from its master weights. """
+        self.W[row, index] = value
+        self._quantize_row(row)
+
+    def set_bias(self, row, bias):
+        """ Changes a row's bias, refitting its threshold against the master weights. """
+        self.b[row] = bias
+        self._fit_threshold(row)
+
+    def _quantize_row(self, row):
+        """ Rebuilds W_q/scale for a row from W, then refits its threshold. """
+        weights = self.W[row]
+        peak = float(np.abs(weights).max())
+        scale = peak / 127 if peak > 0 else 1.0
+        self.W_q[row] = np.round(weights / scale).astype(np.int8)
+        self.scale[row] = scale
+        self._fit_threshold(row)
+
+    def _fit_threshold(self, row):
+        """ Picks the integer threshold that reproduces the float decision
+        W.x + b >= 0 for every 0/1 input pattern (2**max_inputs of them). """
+        n = self.max_inputs
+        patterns = (np.arange(1 << n)[:, None] >> np.arange(n)) & 1
+        fires = patterns @ self.W[row].astype(np.float64) + float(self.b[row]) >= 0
+        acc = patterns @ self.W_q[row].astype(np.int64)
+        lowest_on = acc[fires].min() if fires.any() else acc.max() + 1
+        if not fires.all() and acc[~fires].max() >= lowest_on:
+            # Rounding to int8 reordered two patterns around the threshold: look them up instead
+            logger.debug("Row %s: no exact int8 threshold, using a truth table", row)
+            self._truth_tables[row] = fires.astype(np.int8)
+        else:
+            self._truth_tables.pop(row, None)
+        self.threshold[row] = lowest_on
+        self._dirty[row] = True
+
+    @staticmethod
+    def activation(weighted_sum):
+        """ Step activation, vectorized over every row at once. """
+        return np.greater_equal(weighted_sum, 0).view(np.int8) # Reinterpret the 0/1 bools, no cast copy
+
+    def mark_wiring_changed(self):
+        """ Call whenever a member's input_connections change. """
+        self._wiring_stale = True
+
+    def _rebuild_wiring(self):
+        """ Maps every input slot to its signal bus index. """
+        external_sources = []
+        external_index = {}
+        for perceptron in self.members:
+            for source_obj in perceptron.input_connections:
+                if source_obj is not None and not isinstance(source_obj, Perceptron) \
+                        and id(source_obj) not in external_index:
+                    external_index[id(source_obj)] = len(external_sources)
+                    external_sources.append(source_obj)
+        perceptron_base = 1 + len(external_sources)
+        src_idx = np.zeros((len(self.members), self.max_inputs), dtype=np.int32)
+        for row, perceptron in enumerate(self.members):
+            for i, source_obj in enumerate(perceptron.input_connections):
+                if source_obj is None:
+                    continue # Slot 0 of the bus is always 0.0
+                if isinstance(source_obj, Perceptron):
+                    src_idx[row, i] = perceptron_base + source_obj._row
+                else:
+                    src_idx[row, i] = 1 + external_index[id(source_obj)]
+        self.external_sources = external_sources
+        self.src_idx = src_idx
+        self.sig = np.zeros(perceptron_base + len(self.members), dtype=np.int8)
+        self.sig[perceptron_base:] = self.out
+        self.feeds = np.zeros((len(self.sig), len(self.members)), dtype=bool)
+        self.feeds[src_idx, np.arange(len(self.members))[:, None]] = True
+        self.feeds[0] = False # The constant-0 slot never changes
+        # Only perceptron-to-perceptron edges affect the order; switch rewiring reuses it
+        edges = frozenset((source_obj._row, row) for row, perceptron in enumerate(self.members)
+                          for source_obj in perceptron.input_connections if isinstance(source_obj, Perceptron))
+        if edges != self._layer_edges:
+            self.layers = self._topological_layers(edges)
+            self._layer_edges = edges
+        self._dirty[:] = True
+        self._wiring_stale = False
+
+    def _topological_layers(self, edges):
+        """ Groups rows into layers with Kahn's algorithm: each layer only reads
+        perceptrons from earlier layers, so a signal crosses the network in one frame. """
+        indegree = [0] * len(self.members)
+        dependents = [[] for _ in self.members]
+        for source_row, row in edges:
+            indegree[row] += 1
+            dependents[source_row].append(row)
+        layers = []
+        layer = [row for row, count in enumerate(indegree) if count == 0]
+        while layer:
+            layers.append(np.array(layer, dtype=np.intp))
+            next_layer = []
+            for row in layer:
+                for dependent in dependents[row]:
+                    indegree[dependent] -= 1
+                    if indegree[dependent] == 0:
+                        next_layer.append(dependent)
+            layer = next_layer
+        # Rows on a feedback loop never become ready; evaluate them last against
+        # the previous frame's outputs
+        feedback_rows = [row for row, count in enumerate(indegree) if count > 0]
+        if feedback_rows:
+            layers.append(np.array(feedback_rows, dtype=np.intp))
+        return layers
+
+    def evaluate(self):
+        """ Computes perceptron outputs for this frame, one batched pass per layer.
+        Only rows downstream of a changed signal are recomputed; a row whose output
+        did not change does not dirty its dependents.
+        Returns True if any row was recomputed; the rows whose output flipped are left
+        in changed_rows. """
+        self.changed_rows = []
+        if not self.members:
+            return False
+        if self._wiring_stale:
+            self._rebuild_wiring()
+        perceptron_base = 1 + len(self.external_sources)
+        sig = self.sig
+        dirty = self._dirty
+        # External sources (switches): dirty the rows fed by any that changed
+        external = np.fromiter((source_obj.output_value for source_obj in self.external_sources),
+                               dtype=np.int8, count=perceptron_base - 1) # No intermediate list
+        changed_slots = np.flatnonzero(sig[1:perceptron_base] != external) + 1
+        if changed_slots.size:
+            sig[1:perceptron_base] = external
+            dirty |= self.feeds[changed_slots].any(axis=0)
+        if not dirty.any():
+            return False
+        # sig[perceptron_base:] always mirrors out, so feedback rows read the previous frame's outputs
+        for rows in self.layers:
+            rows = rows[dirty[rows]]
+            if not rows.size:
+                continue
+            x = sig[self.src_idx[rows]] # Gather inputs for every slot of these rows
+            self.x[rows] = x
+            # Integer dot products (int32 accumulation) against the integer thresholds
+            acc = np.einsum('nk,nk->n', self.W_q[rows], x, dtype=np.int32)
+            acc -= self.threshold[rows] # In place, one less temporary
+            outputs = self.activation(acc)
+            if self._truth_tables:
+                for i, row in enumerate(rows.tolist()):
+                    table = self._truth_tables.get(row)
+                    if table is not None:
+                        outputs[i] = table[x[i] @ self._pattern_bits]
+            changed_rows = rows[outputs != self.out[rows]]
+            self.out[rows] = outputs
+            sig[perceptron_base + rows] = outputs
+            dirty[rows] = False
+            if changed_rows.size:
+                self.changed_rows.extend(changed_rows.tolist())
+                dirty |= self.feeds[perceptron_base + changed_rows].any(axis=0)
+        return True
+
+perceptron_pool = PerceptronPool(max_inputs=8)
+
+class Switch(Node):
+    __slots__ = ('output_value', 'output_node_radius', 'output_node_pos', '_output_node_rect',
+                 'toggle_rect', 'toggle_button_color')
+
     def __init__(self, x, y):
         width, height = 40, 40
         color = RED # Start in 'off' state
         super().__init__(x, y, width, height, color)
         self.output_value = 0 # 0 for off, 1 for on
         self.output_node_radius = 6
+        self.sprite_size = (width + self.output_node_radius * 2, height)
 
         # --- Define Toggle Area ---
         # Make it slightly smaller and centered within the main rect
@@ -329,37 +661,40 @@ class Switch(DraggableObject):
         # Color for the toggle button itself
         self.toggle_button_color = BLACK
 
+        # Allocated once; _update_node_positions mutates them in place
+        self.output_node_pos = [0, 0]
+        self._output_node_rect = pygame.Rect(0, 0, self.output_node_radius * 2, self.output_node_radius * 2)
         self._update_node_positions() # Calculate initial node & update toggle rect pos
 
     def _update_node_positions(self):
         """ Calculates the absolute screen positions of connection nodes AND toggle area. """
         # Output node centered vertically on the right edge
-        self.output_node_pos = (self.rect.right + self.output_node_radius, self.rect.centery)
-        self._output_node_rect = pygame.Rect(
-            self.output_node_pos[0] - self.output_node_radius,
-            self.output_node_pos[1] - self.output_node_radius,
-            self.output_node_radius * 2, self.output_node_radius * 2
-        )
+        self.output_node_pos[0] = self.rect.right + self.output_node_radius
+        self.output_node_pos[1] = self.rect.centery
+        self._output_node_rect.x = self.output_node_pos[0] - self.output_node_radius
+        self._output_node_rect.y = self.output_node_pos[1] - self.output_node_radius
         # Update toggle area position relative to the main rect's current position
         toggle_margin = 8
         self.toggle_rect.topleft = (self.rect.left + toggle_margin, self.rect.top + toggle_margin)
+        self._update_hit_bbox()
 
 
     @property
     def output_node_rect(self):
          return self._output_node_rect
 
-    # Add connections param default None
-    def handle_event(self, event, global_state, connections=None):
+    def handle_event(self, event, global_state):
+        if self._event_outside(event):
+            return False # Skip every fine-grained hit test below
         if event.type == pygame.MOUSEBUTTONDOWN:
             # --- Check Nodes First (Unaffected by toggle/drag distinction) ---
-            if hasattr(self, '_output_node_rect') and self._output_node_rect.collidepoint(event.pos):
+            if self._output_node_rect.collidepoint(event.pos):
                  # Start connection (Left-click only)
                  if event.button == 1:
-                      print(f"Clicked output node of switch {self.id}")
-                      global_state['is_drawing_connection'] = True
-                      global_state['connection_start_obj'] = self
-                      global_state['connection_start_pos'] = self.output_node_pos
+                      logger.debug("Clicked output node of switch %s", self.id)
+                      global_state.is_drawing_connection = True
+                      global_state.connection_start_obj = self
+                      global_state.connection_start_pos = tuple(self.output_node_pos) # Snapshot, the list moves with drags
                       return True # Handled
 
             # --- Left Click Logic (Check Toggle vs Drag) ---
@@ -367,15 +702,16 @@ class Switch(DraggableObject):
                  # 1. Check Toggle Area FIRST
                  if self.toggle_rect.collidepoint(event.pos):
                       # Only toggle if not currently drawing a connection from elsewhere
-                      if not global_state.get('is_drawing_connection'):
-                           print(f"Toggling switch {self.id} via toggle area")
+                      if not global_state.is_drawing_connection:
+                           logger.debug("Toggling switch %s via toggle area", self.id)
                            self.output_value = 1 - self.output_value
+                           mark_downstream_lights(self)
                            # Update color based on state (handled in draw)
                            return True # Handled state toggle
                  # 2. Check Rest of the Body for Drag
                  elif self.rect.collidepoint(event.pos):
                       # Click was inside main body but *not* the toggle area
-                      print(f"Starting drag for switch {self.id}")
+                      logger.debug("Starting drag for switch %s", self.id)
                       self.is_dragging = True
                       self.drag_offset_x = self.rect.x - event.pos[0]
                       self.drag_offset_y = self.rect.y - event.pos[1]
@@ -386,14 +722,14 @@ class Switch(DraggableObject):
                  # Allow right-click on body to potentially select/inspect later?
                  # For now, maybe just consume the click if it's on the body
                  if self.rect.collidepoint(event.pos):
-                     print(f"Right-clicked switch {self.id}")
+                     logger.debug("Right-clicked switch %s", self.id)
                      return True # Consume right-click on body
 
         # --- Mouse Button Up (Stop Drag) ---
         elif event.type == pygame.MOUSEBUTTONUP:
             if event.button == 1 and self.is_dragging: # Check button if needed
                 self.is_dragging = False
-                print(f"Stopped drag for switch {self.id}")
+                logger.debug("Stopped drag for switch %s", self.id)
                 return True
 
         # --- Mouse Motion (Update Drag) ---
@@ -407,27 +743,39 @@ class Switch(DraggableObject):
         return False # Event not handled
 
 
-    def draw(self, surface):
-        """ Draws the switch body, toggle area, and output node. """
+    def _sprite_key(self):
+        return (Switch, self.output_value)
+
+    def _render_sprite(self):
+        """ Draws the switch body, toggle area, and output node into a sprite. """
+        _rect = pygame.draw.rect; _circle = pygame.draw.circle # Local aliases (skip attribute chains)
+        sprite = pygame.Surface(self.sprite_size, pygame.SRCALPHA).convert_alpha()
+        ox, oy = self.rect.topleft
         # Update body color based on state
         body_color = GREEN if self.output_value == 1 else RED
         # Draw the main body
-        pygame.draw.rect(surface, body_color, self.rect)
-        pygame.draw.rect(surface, BLACK, self.rect, 1) # Border
+        body_rect = self.rect.move(-ox, -oy)
+        _rect(sprite, body_color, body_rect)
+        _rect(sprite, BLACK, body_rect, 1) # Border
 
         # --- Draw the Toggle Area ---
-        pygame.draw.rect(surface, self.toggle_button_color, self.toggle_rect)
+        toggle_rect = self.toggle_rect.move(-ox, -oy)
+        _rect(sprite, self.toggle_button_color, toggle_rect)
         # Add a small border to toggle area for visibility
-        pygame.draw.rect(surface, WHITE, self.toggle_rect, 1)
+        _rect(sprite, WHITE, toggle_rect, 1)
 
         # --- Draw Output Node ---
-        if hasattr(self, 'output_node_pos'): # Check exists
-            pygame.draw.circle(surface, BLACK, self.output_node_pos, self.output_node_radius)
-            inner_color = GREEN if self.output_value == 1 else WHITE
-            pygame.draw.circle(surface, inner_color, self.output_node_pos, self.output_node_radius - 2)
-        
+        pos = (self.output_node_pos[0] - ox, self.output_node_pos[1] - oy)
+        _circle(sprite, BLACK, pos, self.output_node_radius)
+        inner_color = GREEN if self.output_value == 1 else WHITE
+        _circle(sprite, inner_color, pos, self.output_node_radius - 2)
+        return sprite
+
 # --- Light Class ---
-class Light(DraggableObject):
+class Light(Node):
+    __slots__ = ('radius', 'input_value', 'num_inputs', 'input_connections', 'input_node_radius',
+                 'input_nodes_pos', '_input_node_rects')
+
     def __init__(self, x, y):
         radius = 20 # Make it circular visually
         # Position rect based on center for easier circle drawing
@@ -437,22 +785,25 @@ class Light(DraggableObject):
         self.num_inputs = 1 # Lights only have one input
         self.input_connections = [None] * self.num_inputs
         self.input_node_radius = 5
+        self.sprite_margin = (self.input_node_radius * 2, 0)
+        self.sprite_size = (radius * 2 + self.input_node_radius * 2, radius * 2)
+        # Allocated once; _update_node_positions mutates them in place
+        self.input_nodes_pos = [[0, 0]] # Store as list for consistency
+        self._input_node_rects = [pygame.Rect(0, 0, self.input_node_radius * 2, self.input_node_radius * 2)]
         self._update_node_positions() # Calculate initial node position
 
     def _update_node_positions(self):
         """ Calculates the absolute screen positions of connection nodes. """
         # Input node centered vertically on the left edge
-        node_x = self.rect.left - self.input_node_radius
-        node_y = self.rect.centery
-        self.input_nodes_pos = [(node_x, node_y)] # Store as list for consistency
+        pos = self.input_nodes_pos[0]
+        pos[0] = self.rect.left - self.input_node_radius
+        pos[1] = self.rect.centery
 
-        # Calculate clickable area (Rect) for the node
-        self._input_node_rects = [
-            pygame.Rect(
-                pos[0] - self.input_node_radius, pos[1] - self.input_node_radius,
-                self.input_node_radius * 2, self.input_node_radius * 2
-            ) for pos in self.input_nodes_pos
-        ]
+        # Update clickable area (Rect) for the node
+        self._input_node_rects[0].x = pos[0] - self.input_node_radius
+        self._input_node_rects[0].y = pos[1] - self.input_node_radius
+        self._file_input_nodes()
+        self._update_hit_bbox()
 
     def get_input_node_rect(self, index):
          # Provide access for connection logic (only index 0 is valid)
@@ -460,38 +811,35 @@ class Light(DraggableObject):
              return self._input_node_rects[0]
         return None
 
-    def handle_event(self, event, global_state, connections=None):
+    def handle_event(self, event, global_state):
+        if self._event_outside(event):
+            return False # Skip every fine-grained hit test below
         # --- Dragging Logic (Call Parent) ---
         # Use super() properly if DraggableObject.handle_event contains useful base logic
-        drag_handled = super().handle_event(event, global_state, connections)
+        drag_handled = super().handle_event(event, global_state)
         if drag_handled:
              return True
 
         # --- Node Click Handling ---
         if event.type == pygame.MOUSEBUTTONDOWN:
-            node_rect = self.get_input_node_rect(0) # Lights only have input 0
-            if node_rect and node_rect.collidepoint(event.pos):
+            if self._input_node_rects[0].collidepoint(event.pos): # Lights only have input 0
                 # --- Right-click for deleting connection ---
                 if event.button == 3: # Right mouse button
-                    print(f"Right-clicked input node of light {self.id}")
+                    logger.debug("Right-clicked input node of light %s", self.id)
                     if self.input_connections[0] is not None:
-                        print(f"  Removing connection to light input")
+                        logger.debug("  Removing connection to light input")
                         self.input_connections[0] = None
-                        # Remove from global list
-                        for idx in range(len(connections) - 1, -1, -1):
-                            conn = connections[idx]
-                            if conn['target_obj'] == self and conn['target_input_idx'] == 0:
-                                connections.pop(idx)
-                                print(f"  Removed connection entry from global list.")
-                                break
+                        # Remove from global connections
+                        if remove_connection((self.id, 0)) is not None:
+                            logger.debug("  Removed connection entry from global connections.")
                         return True # Handled removal
                     else:
-                        print(f"  Light input is not connected.")
+                        logger.debug("  Light input is not connected.")
                         return True # Handled click
                 # --- Left-click (potential connection end, consume click) ---
                 elif event.button == 1:
-                     if not global_state.get('is_drawing_connection'):
-                          print(f"Clicked input node of light {self.id}")
+                     if not global_state.is_drawing_connection:
+                          logger.debug("Clicked input node of light %s", self.id)
                           return True # Consume click
 
         return False # Event not handled by specific light logic
@@ -499,29 +847,36 @@ class Light(DraggableObject):
     def update_state(self):
          """ Updates the light's input value based on its connection. """
          source_obj = self.input_connections[0]
-         if source_obj:
-             # Use getattr for safety, default to 0 if no output_value
-             self.input_value = getattr(source_obj, 'output_value', 0)
+         if source_obj is not None:
+             # Every connectable source defines output_value
+             self.input_value = source_obj.output_value
          else:
              self.input_value = 0 # No connection, input is 0
 
-    def draw(self, surface):
-        """ Draws the light body and its input node. """
+    def _sprite_key(self):
+        return (Light, self.input_value)
+
+    def _render_sprite(self):
+        """ Draws the light body and its input node into a sprite. """
+        _circle = pygame.draw.circle # Local alias (skip attribute chains)
+        sprite = pygame.Surface(self.sprite_size, pygame.SRCALPHA).convert_alpha()
+        ox, oy = self.rect.x - self.sprite_margin[0], self.rect.y - self.sprite_margin[1]
         # Determine color based on input value
         light_color = YELLOW if self.input_value == 1 else GREY
 
         # Draw the main body (circle)
         # Use rect.center for consistent positioning
-        pygame.draw.circle(surface, light_color, self.rect.center, self.radius)
-        pygame.draw.circle(surface, BLACK, self.rect.center, self.radius, 1) # Border
+        center = (self.rect.centerx - ox, self.rect.centery - oy)
+        _circle(sprite, light_color, center, self.radius)
+        _circle(sprite, BLACK, center, self.radius, 1) # Border
 
         # Draw input node (only one)
-        if self.input_nodes_pos:
-            pos = self.input_nodes_pos[0]
-            pygame.draw.circle(surface, BLACK, pos, self.input_node_radius)
-            # Indicate input value state
-            inner_color = GREEN if self.input_value == 1 else WHITE
-            pygame.draw.circle(surface, inner_color, pos, self.input_node_radius - 2)
+        pos = (self.input_nodes_pos[0][0] - ox, self.input_nodes_pos[0][1] - oy)
+        _circle(sprite, BLACK, pos, self.input_node_radius)
+        # Indicate input value state
+        inner_color = GREEN if self.input_value == 1 else WHITE
+        _circle(sprite, inner_color, pos, self.input_node_radius - 2)
+        return sprite
 
 
 # --- Main loop and remaining code ---
@@ -536,6 +891,12 @@ SCREEN_HEIGHT = 600
 screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
 pygame.display.set_caption("Perceptron Playground - Inputs & Outputs")
 
+# --- Glyph Atlas (Rendered once; convert_alpha needs the display mode set) ---
+GLYPHS = {c: font.render(c, True, WHITE).convert_alpha() for c in "+-0123456789"}
+Perceptron._font = font
+Perceptron._plus_surf = GLYPHS['+']
+Perceptron._minus_surf = GLYPHS['-']
+
 # --- Create Objects ---
 # Add Switches and Lights alongside Perceptrons
 switch1 = Switch(50, 50)
@@ -547,112 +908,258 @@ light2 = Light(600, 250)
 
 
 all_objects = [switch1, switch2, perceptron1, perceptron2, light1, light2] # Add new objects
-connections = []
+# Capability views, checked once here rather than per event / per frame
+event_handlers = [obj for obj in all_objects if callable(getattr(obj, 'handle_event', None))]
+event_handlers_reversed = event_handlers[::-1] # Topmost first, for dispatch; rebuild with event_handlers
+drawables = [obj for obj in all_objects if callable(getattr(obj, 'get_sprite', None))]
+# Connections keyed by (target_obj.id, target_input_idx); each input holds at most one
+connections = {}
+# Reverse index: obj.id -> {connection key: connection} for every wire touching obj
+connections_by_obj = {}
+
+# Lights whose source changed or was rewired; only these are updated next frame
+lights_dirty = {obj for obj in all_objects if isinstance(obj, Light)} # All start unevaluated
+
+def mark_downstream_lights(source_obj):
+    """ Queues every light wired to source_obj's output for an update. """
+    for conn in connections_by_obj.get(source_obj.id, {}).values():
+        if conn['source_obj'] is source_obj and isinstance(conn['target_obj'], Light):
+            lights_dirty.add(conn['target_obj'])
+
+def add_connection(source_obj, target_obj, target_input_idx):
+    """ Wires source_obj's output to a target input, replacing any wire already on it. """
+    key = (target_obj.id, target_input_idx)
+    remove_connection(key)
+    conn = {'source_obj': source_obj, 'target_obj': target_obj, 'target_input_idx': target_input_idx,
+            # Live position lists, not copies; segment is refreshed when either end moves
+            'start_pos': source_obj.output_node_pos, 'end_pos': target_obj.input_nodes_pos[target_input_idx]}
+    conn['segment'] = (tuple(conn['start_pos']), tuple(conn['end_pos']))
+    connections[key] = conn
+    connections_by_obj.setdefault(source_obj.id, {})[key] = conn
+    connections_by_obj.setdefault(target_obj.id, {})[key] = conn
+    if isinstance(target_obj, Light): lights_dirty.add(target_obj)
+    return conn
+
+def remove_connection(key):
+    """ Drops the wire on a target input, if any, and returns it. """
+    conn = connections.pop(key, None)
+    if conn is not None:
+        connections_by_obj[conn['source_obj'].id].pop(key, None)
+        connections_by_obj[conn['target_obj'].id].pop(key, None)
+        if isinstance(conn['target_obj'], Light): lights_dirty.add(conn['target_obj'])
+    return conn
+
+# --- Global State for Connection Drawing ---
+class _ConnState:
+    """ Wire-drawing state shared by the main loop and every handle_event. """
+    __slots__ = ('is_drawing_connection', 'connection_start_obj', 'connection_start_pos')
+
+    def __init__(self):
+        self.is_drawing_connection = False
+        self.connection_start_obj = None
+        self.connection_start_pos = None
+
+global_connection_state = _ConnState()
+
+# --- Dirty-Rect Redraw State ---
+screen_rect = screen.get_rect()
+MAX_DIRTY_RECTS = 16 # Beyond this, redraw their union once instead of each rect
+full_redraw = True # Whole screen needs repainting (first frame, window exposed)
+last_segments = set() # Connection lines drawn last frame
+last_temp_line = None # Temporary connection line drawn last frame
+wire_runs = [] # (bounds, points) polylines of the connection lines, rebuilt when the wires change
+background = screen.copy() # White canvas plus the established wires; repainted only where wires change
+background.fill(WHITE)
+
+def line_bounds(start_pos, end_pos, width=2):
+    """ Screen area covered by a line of the given width. """
+    left, top = min(start_pos[0], end_pos[0]), min(start_pos[1], end_pos[1])
+    rect = pygame.Rect(left, top, abs(end_pos[0] - start_pos[0]) + 1, abs(end_pos[1] - start_pos[1]) + 1)
+    return rect.inflate(width * 2, width * 2)
+
+def polyline_runs(segments):
+    """ Joins segments that continue from the previous segment's end into point runs,
+    so each run is drawn with a single pygame.draw.lines call. """
+    runs = []
+    for start_pos, end_pos in segments:
+        if runs and runs[-1][-1] == start_pos:
+            runs[-1].append(end_pos)
+        else:
+            runs.append([start_pos, end_pos])
+    return runs
 
-# --- Global State for Connection Drawing (Unchanged) ---
-global_connection_state = {
-    'is_drawing_connection': False,
-    'connection_start_obj': None,
-    'connection_start_pos': None,
-}
+def run_bounds(points, width=2):
+    """ Screen area covered by a polyline of the given width. """
+    xs = [p[0] for p in points]
+    ys = [p[1] for p in points]
+    return line_bounds((min(xs), min(ys)), (max(xs), max(ys)), width)
 
 # --- Game Loop ---
 running = True
 clock = pygame.time.Clock()
+ACTIVE_FPS = 60
+IDLE_FPS = 15 # Frame cap once nothing has changed for IDLE_AFTER_MS
+IDLE_AFTER_MS = 500
+last_activity_time = 0
+# Event types still read while a connection is being drawn
+CONNECTING_EVENTS = (pygame.QUIT, pygame.MOUSEMOTION, pygame.MOUSEBUTTONUP,
+                     pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED)
+draw_line = pygame.draw.line # Bound once for the per-frame connection drawing
+draw_lines = pygame.draw.lines
 
 while running:
     mouse_pos = pygame.mouse.get_pos()
 
     # --- Event Handling ---
-    events = pygame.event.get()
+    if global_connection_state.is_drawing_connection:
+        # Mid-wire only motion and the release matter: filter in C, drop stray presses/keys
+        events = pygame.event.get(CONNECTING_EVENTS)
+        pygame.event.clear((pygame.MOUSEBUTTONDOWN, pygame.KEYDOWN, pygame.KEYUP))
+    else:
+        events = pygame.event.get()
+    dirty = full_redraw or bool(events) # Without input or recomputed perceptrons nothing on screen can change
+    # Coalesce motion bursts: a MOUSEMOTION followed directly by another is superseded
+    # (handlers only read event.pos), so drop it before it reaches the dispatcher
+    events = [event for event, next_event in zip(events, events[1:] + [None])
+              if not (event.type == pygame.MOUSEMOTION and next_event is not None
+                      and next_event.type == pygame.MOUSEMOTION)]
     for event in events:
         if event.type == pygame.QUIT:
             running = False
+        elif event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+            full_redraw = True
 
         handled_by_ui = False
-        # Global MOUSEBUTTONUP for finalizing connections (Unchanged)
-        if event.type == pygame.MOUSEBUTTONUP and global_connection_state['is_drawing_connection']:
-            # ... (existing connection finalization logic unchanged) ...
+        # Global MOUSEBUTTONUP for finalizing connections
+        if event.type == pygame.MOUSEBUTTONUP and global_connection_state.is_drawing_connection:
+            # Find the input node under the cursor via the grid, then wire it with add_connection
             handled_by_ui = True # Make sure this is set
-            start_obj = global_connection_state['connection_start_obj']
+            start_obj = global_connection_state.connection_start_obj
             # ... find target ...
             target_found = False
-            for obj in all_objects:
-                if isinstance(obj, (Perceptron, Light)):
-                     for i in range(getattr(obj, 'num_inputs', 0)):
-                          input_rect = None
-                          if hasattr(obj, 'get_input_node_rect') and callable(getattr(obj, 'get_input_node_rect')):
-                              input_rect = obj.get_input_node_rect(i)
-                          if input_rect and input_rect.collidepoint(event.pos):
-                              target_obj = obj
-                              target_input_index = i
-                              print(f"Connection success: Obj {start_obj.id} output -> Obj {target_obj.id} input {target_input_index}")
-                              # ... (update target_obj.input_connections and global connections list) ...
-                              if hasattr(target_obj, 'input_connections') and target_input_index < len(target_obj.input_connections):
-                                   if target_obj.input_connections[target_input_index] is not None: print("Warning: Input node already connected. Overwriting.")
-                                   target_obj.input_connections[target_input_index] = start_obj
-                              else: print(f"Error: Target object {target_obj.id} missing or has invalid input_connections.")
-                              # Add/Update global list
-                              existing_conn_idx = -1
-                              for idx, conn in enumerate(connections):
-                                   if conn['target_obj'] == target_obj and conn['target_input_idx'] == target_input_index:
-                                       existing_conn_idx = idx
-                                       break
-                              if existing_conn_idx != -1: connections[existing_conn_idx]['source_obj'] = start_obj
-                              else: connections.append({'source_obj': start_obj, 'target_obj': target_obj, 'target_input_idx': target_input_index})
-                              target_found = True
-                              break
-                if target_found: break
-            if not target_found: print("Connection cancelled.")
+            cursor_rect = pygame.Rect(event.pos, (1, 1))
+            # Only objects filed under the cursor's grid cell can have an input there
+            cursor_cell = (event.pos[0] // INPUT_GRID_CELL, event.pos[1] // INPUT_GRID_CELL)
+            for obj in input_node_grid.get(cursor_cell, ()):
+                i = cursor_rect.collidelist(obj._input_node_rects) # Scan in C
+                if i != -1:
+                     target_obj = obj
+                     target_input_index = i
+                     logger.debug("Connection success: Obj %s output -> Obj %s input %s", start_obj.id, target_obj.id, target_input_index)
+                     # ... (update target_obj.input_connections and global connections) ...
+                     # i indexes _input_node_rects, which always parallels input_connections
+                     if target_obj.input_connections[target_input_index] is not None: logger.warning("Input node already connected. Overwriting.")
+                     target_obj.input_connections[target_input_index] = start_obj
+                     if isinstance(target_obj, Perceptron): perceptron_pool.mark_wiring_changed() # Lights aren't pool rows
+                     # Add/Update global connections (and the per-object index)
+                     add_connection(start_obj, target_obj, target_input_index)
+                     target_found = True
+                     break
+            if not target_found: logger.debug("Connection cancelled.")
             # Reset global state
-            global_connection_state['is_drawing_connection'] = False
-            global_connection_state['connection_start_obj'] = None
-            global_connection_state['connection_start_pos'] = None
+            global_connection_state.is_drawing_connection = False
+            global_connection_state.connection_start_obj = None
+            global_connection_state.connection_start_pos = None
 
 
         # --- Pass events to objects if not handled globally ---
         if not handled_by_ui:
-            for obj in reversed(all_objects):
-                if hasattr(obj, 'handle_event') and callable(getattr(obj, 'handle_event')):
-                    # *** MODIFIED: Pass connections list ***
-                    if obj.handle_event(event, global_connection_state, connections):
-                        handled_by_ui = True
-                        break
-
-    # --- Update State (Unchanged) ---
-    # 1. Update Perceptrons
-    for obj in all_objects:
-        if isinstance(obj, Perceptron): obj.calculate_output()
-    # 2. Update Lights
-    for obj in all_objects:
-        if isinstance(obj, Light): obj.update_state()
-
-    # --- Drawing (Unchanged) ---
-    screen.fill(WHITE)
-    # Draw established connections
-    for conn in connections:
-        # ... (existing connection drawing logic) ...
-        source = conn['source_obj']
-        target = conn['target_obj']
-        target_idx = conn['target_input_idx']
-        start_pos = getattr(source, 'output_node_pos', None)
-        end_pos = None
-        target_input_nodes = getattr(target, 'input_nodes_pos', None)
-        if target_input_nodes and 0 <= target_idx < len(target_input_nodes):
-            end_pos = target_input_nodes[target_idx]
-        if start_pos and end_pos:
-            pygame.draw.line(screen, BLUE, start_pos, end_pos, 2)
-    # Draw temporary connection line
-    if global_connection_state['is_drawing_connection'] and global_connection_state['connection_start_pos']:
-        start_pos = global_connection_state['connection_start_pos']
-        pygame.draw.line(screen, YELLOW, start_pos, mouse_pos, 2)
-    # Draw all objects
-    for obj in all_objects:
-        if hasattr(obj, 'draw') and callable(getattr(obj, 'draw')): obj.draw(screen)
-
-    # --- Update Display ---
-    pygame.display.flip()
-    clock.tick(60)
+            # Presses can only hit objects near the cursor (the only _hit_bbox test for them);
+            # drags/releases go to everyone and handlers screen releases via _event_outside
+            press_pos = event.pos if event.type == pygame.MOUSEBUTTONDOWN else None
+            for obj in event_handlers_reversed:
+                if press_pos is not None and not obj._hit_bbox.collidepoint(press_pos):
+                    continue
+                if obj.handle_event(event, global_connection_state):
+                    handled_by_ui = True
+                    break
+
+    # --- Update State ---
+    # 1. Update Perceptrons (single batched pass over the pool)
+    if perceptron_pool.evaluate(): dirty = True
+    # 2. Update Lights (only those downstream of a flipped output or a rewire)
+    for row in perceptron_pool.changed_rows:
+        mark_downstream_lights(perceptron_pool.members[row])
+    for light in lights_dirty:
+        light.update_state()
+    lights_dirty.clear()
+
+    # --- Drawing (Dirty regions only) ---
+    if dirty:
+        # Gather this frame's visuals
+        blit_list = [obj.get_sprite() for obj in drawables]
+        temp_line = None
+        temp_start = global_connection_state.connection_start_pos # Only set while drawing a connection
+        if temp_start:
+            temp_line = (temp_start, mouse_pos)
+
+        # Collect areas whose content changed since the last frame
+        dirty_rects = []
+        # Objects: state or position change shows up as a different (sprite, topleft)
+        for obj, blit in zip(drawables, blit_list):
+            if blit != obj._last_blit:
+                new_rect = pygame.Rect(blit[1], blit[0].get_size())
+                # Moved, or inputs added/removed: refresh only the wires touching this object
+                for conn in connections_by_obj.get(obj.id, {}).values():
+                    conn['segment'] = (tuple(conn['start_pos']), tuple(conn['end_pos']))
+                if obj._last_rect is not None: dirty_rects.append(obj._last_rect)
+                dirty_rects.append(new_rect)
+                obj._last_blit = blit
+                obj._last_rect = new_rect
+        # Wires added, removed or moved
+        segments = [conn['segment'] for conn in connections.values()]
+        segment_set = set(segments)
+        if segment_set != last_segments:
+            wire_rects = [line_bounds(start_pos, end_pos) for start_pos, end_pos in segment_set ^ last_segments]
+            if len(wire_rects) > MAX_DIRTY_RECTS:
+                wire_rects = [wire_rects[0].unionall(wire_rects[1:])]
+            wire_runs = [(run_bounds(run), run) for run in polyline_runs(segments)]
+            # Bring the background up to date under the changed wires. Runs crossing those
+            # areas are redrawn whole and unclipped: a clipped line rasterizes differently
+            # (notches at the rect edge), while redrawing an unchanged line is idempotent
+            for rect in wire_rects:
+                background.fill(WHITE, rect)
+            for bounds, run in wire_runs:
+                if bounds.collidelist(wire_rects) != -1: draw_lines(background, BLUE, False, run, 2)
+            dirty_rects.extend(wire_rects)
+        if temp_line != last_temp_line:
+            for line in (last_temp_line, temp_line):
+                if line: dirty_rects.append(line_bounds(*line))
+        if temp_line and dirty_rects:
+            # The temp line is drawn unclipped beneath the sprites: repaint its whole area
+            dirty_rects.append(line_bounds(*temp_line))
+        last_segments = segment_set
+        last_temp_line = temp_line
+        if full_redraw:
+            dirty_rects = [screen_rect]
+            full_redraw = False
+
+        # Cull to the window: parts of objects/wires dragged off-screen need no repaint
+        dirty_rects = [clipped for clipped in (rect.clip(screen_rect) for rect in dirty_rects) if clipped]
+
+        # Repaint only the dirty areas (clipped), then push just those to the display
+        if dirty_rects:
+            if len(dirty_rects) > MAX_DIRTY_RECTS:
+                dirty_rects = [dirty_rects[0].unionall(dirty_rects[1:])]
+            sprite_rects = [obj._last_rect for obj in drawables]
+            for rect in dirty_rects:
+                # Restore white + established connections from the background in one blit
+                screen.blit(background, rect, rect)
+            # Draw temporary connection line once, unclipped: pygame rasterizes a clipped
+            # line differently, which would leave notches at the rect edges
+            if temp_line:
+                draw_line(screen, YELLOW, temp_line[0], temp_line[1], 2)
+            for rect in dirty_rects:
+                screen.set_clip(rect)
+                # Draw the objects overlapping this area (cached sprites, one batched blit)
+                blit_sprites(screen, [blit_list[i] for i in rect.collidelistall(sprite_rects)])
+            screen.set_clip(None)
+            pygame.display.update(dirty_rects)
+
+    # Throttle while idle; the first event or output change restores the full rate
+    if dirty: last_activity_time = pygame.time.get_ticks()
+    idle = pygame.time.get_ticks() - last_activity_time >= IDLE_AFTER_MS
+    clock.tick(IDLE_FPS if idle else ACTIVE_FPS)
 
 # --- Cleanup (Unchanged) ---
 pygame.font.quit()